@@ -1,18 +1,62 @@
 import customtkinter as ctk
-from tkinter import filedialog, messagebox
+from tkinter import filedialog, messagebox, TclError
 from tkcalendar import DateEntry
 import os
+import json
+import shutil
 import threading
 import time
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from PIL import Image
 import requests
 import re
 from datetime import datetime
 
+# OCR dan barcode bersifat opsional, ekstraksi otomatis dilewati jika tidak terpasang.
+# pytesseract butuh binary tesseract, pyzbar butuh library zbar (lihat README).
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
+else:
+    try:
+        pytesseract.get_tesseract_version()
+    except Exception:
+        # Paket Python terpasang tapi binary tesseract tidak ditemukan
+        pytesseract = None
+
+try:
+    from pyzbar import pyzbar
+except ImportError:
+    # Termasuk saat library zbar tidak ditemukan
+    pyzbar = None
+
 # Set appearance mode and color theme
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
+# --- Konfigurasi Arsip File Terkirim ---
+# File yang sudah terupload dipindahkan ke <folder scan>/terkirim/YYYY-MM-DD
+SENT_DIR_NAME = "terkirim"
+SENT_RETENTION_DAYS = 30
+SENT_QUOTA_BYTES = 2 * 1024 * 1024 * 1024
+# Daftar file terkirim yang gagal dipindah, agar tetap disembunyikan setelah restart
+SENT_MANIFEST_NAME = "belum_diarsip.json"
+
+# --- Konfigurasi Ekstraksi Otomatis (OCR/Barcode) ---
+NIK_PATTERN = r"\d{16}"
+NO_AKTA_PATTERN = r"\d{4}-[A-Z]{2}-\d{8}-\d{4}"
+# Area yang dibaca (fraksi kiri, atas, kanan, bawah) dan ukuran maksimal setelah diperkecil
+EXTRACT_CROP_BOX = (0.0, 0.0, 1.0, 0.5)
+EXTRACT_MAX_SIZE = 1600
+EXTRACT_WORKERS = 2
+# Batas pembuatan ulang process pool setelah worker crash sebelum fitur dimatikan
+EXTRACT_MAX_POOL_RESTARTS = 3
+EXTRACTION_AVAILABLE = pytesseract is not None or pyzbar is not None
+
 # --- Konfigurasi Kategori dan Skema ---
 CATEGORY_CONFIG = {
     "Akta Kelahiran": {
@@ -163,6 +207,199 @@ class AktaFormattedEntry(ctk.CTkEntry):
                 pass
         
         self._last_value = formatted
+    
+    def set_value(self, value):
+        """Isi nilai yang sudah terformat dari luar (mis. hasil ekstraksi)"""
+        self.delete(0, ctk.END)
+        if value:
+            self.insert(0, value)
+        self._last_value = value
+
+
+def archive_sent_files(folder, file_names):
+    """Pindahkan file terkirim ke folder arsip bertanggal, kembalikan daftar kegagalan"""
+    dated_dir = os.path.join(folder, SENT_DIR_NAME, datetime.now().strftime('%Y-%m-%d'))
+    failures = []
+    
+    try:
+        os.makedirs(dated_dir, exist_ok=True)
+    except Exception as e:
+        return [(file_name, e) for file_name in file_names]
+    
+    for file_name in file_names:
+        src = os.path.join(folder, file_name)
+        dst = os.path.join(dated_dir, file_name)
+        
+        # Hindari menimpa arsip dengan nama yang sama
+        if os.path.exists(dst):
+            base, ext = os.path.splitext(file_name)
+            dst = os.path.join(dated_dir, f"{base}_{datetime.now().strftime('%H%M%S%f')}{ext}")
+        
+        try:
+            # Rename atomik (satu filesystem), tidak menyalin isi file
+            os.replace(src, dst)
+        except Exception as e:
+            failures.append((file_name, e))
+    
+    return failures
+
+
+def file_signature(file_path):
+    """Ukuran dan mtime file, None jika file tidak ada"""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def load_sent_manifest(folder):
+    """Baca manifest file terkirim yang belum diarsip: {nama file: (ukuran, mtime)}"""
+    manifest_path = os.path.join(folder, SENT_DIR_NAME, SENT_MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {name: tuple(signature) for name, signature in data.items()}
+
+
+def save_sent_manifest(folder, manifest):
+    """Tulis manifest secara atomik (tulis file sementara lalu rename)"""
+    sent_root = os.path.join(folder, SENT_DIR_NAME)
+    manifest_path = os.path.join(sent_root, SENT_MANIFEST_NAME)
+    
+    if not manifest:
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+        return
+    
+    os.makedirs(sent_root, exist_ok=True)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({name: list(signature) for name, signature in manifest.items()}, f)
+    os.replace(tmp_path, manifest_path)
+
+
+def enforce_sent_retention(folder, max_age_days=SENT_RETENTION_DAYS, max_bytes=SENT_QUOTA_BYTES):
+    """Hapus arsip terkirim yang melebihi batas umur atau kuota disk"""
+    sent_root = os.path.join(folder, SENT_DIR_NAME)
+    if not os.path.isdir(sent_root):
+        return []
+    
+    failures = []
+    today = datetime.now().date()
+    archived = []
+    
+    try:
+        dir_names = sorted(os.listdir(sent_root))
+    except OSError as e:
+        return [(SENT_DIR_NAME, e)]
+    
+    for dir_name in dir_names:
+        dir_path = os.path.join(sent_root, dir_name)
+        try:
+            dir_date = datetime.strptime(dir_name, '%Y-%m-%d').date()
+        except ValueError:
+            continue
+        
+        if (today - dir_date).days > max_age_days:
+            try:
+                shutil.rmtree(dir_path)
+            except Exception as e:
+                failures.append((dir_name, e))
+            continue
+        
+        try:
+            file_names = sorted(os.listdir(dir_path))
+        except OSError as e:
+            # Misal file biasa bernama tanggal atau izin ditolak di share jaringan
+            failures.append((dir_name, e))
+            continue
+        
+        for file_name in file_names:
+            file_path = os.path.join(dir_path, file_name)
+            try:
+                archived.append((file_path, os.path.getsize(file_path)))
+            except OSError:
+                pass
+    
+    # Kuota: hapus arsip terlama lebih dulu (urut tanggal folder, lalu nama)
+    total = sum(size for _, size in archived)
+    for file_path, size in archived:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(file_path)
+            total -= size
+        except Exception as e:
+            failures.append((os.path.basename(file_path), e))
+    
+    return failures
+
+
+def file_hash(file_path):
+    """Hitung SHA-1 isi file untuk kunci cache ekstraksi"""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_identifiers(text):
+    """Cari kandidat NIK dan No. Akta dengan bentuk yang sama seperti di validasi form"""
+    found = {}
+    upper = text.upper()
+    
+    # OCR sering membaca tanda '-' sebagai spasi atau menghilangkannya,
+    # hasilnya dinormalisasi ke bentuk NO_AKTA_PATTERN
+    akta = re.search(r"(\d{4})[-\s]*([A-Z]{2})[-\s]*(\d{8})[-\s]*(\d{4})", upper)
+    if akta:
+        found['noAkta'] = "-".join(akta.groups())
+    
+    # Gabungkan digit yang terpisah spasi/titik sebelum mencari 16 digit
+    digits = re.sub(r"(?<=\d)[ .]+(?=\d)", "", upper)
+    nik = re.search(rf"(?<!\d){NIK_PATTERN}(?!\d)", digits)
+    if nik:
+        found['nik'] = nik.group()
+    
+    return found
+
+
+def extract_identifiers(file_path):
+    """Worker process: baca barcode/QR lalu OCR pada area yang dipotong dan diperkecil"""
+    left, top, right, bottom = EXTRACT_CROP_BOX
+    
+    with Image.open(file_path) as img:
+        # Untuk JPEG, decode langsung dalam grayscale dan skala DCT yang diperkecil
+        # sehingga area potong tetap >= EXTRACT_MAX_SIZE tanpa decode resolusi penuh
+        width, height = img.size
+        crop_w, crop_h = width * (right - left), height * (bottom - top)
+        scale = min(1.0, EXTRACT_MAX_SIZE / max(crop_w, crop_h, 1))
+        img.draft('L', (int(width * scale), int(height * scale)))
+        
+        # Potong dulu (ukuran setelah draft), baru konversi dan perkecil
+        width, height = img.size
+        img = img.crop((int(width * left), int(height * top),
+                        int(width * right), int(height * bottom)))
+        img = img.convert('L')
+        img.thumbnail((EXTRACT_MAX_SIZE, EXTRACT_MAX_SIZE), Image.LANCZOS)
+    
+    found = {}
+    
+    # Barcode/QR lebih cepat dan akurat, coba lebih dulu.
+    # Error decoder/OCR sengaja tidak ditangkap agar hasil kosong palsu tidak ikut di-cache.
+    if pyzbar is not None:
+        for symbol in pyzbar.decode(img):
+            for key, value in parse_identifiers(symbol.data.decode('utf-8', 'ignore')).items():
+                found.setdefault(key, value)
+    
+    if pytesseract is not None and len(found) < 2:
+        for key, value in parse_identifiers(pytesseract.image_to_string(img)).items():
+            found.setdefault(key, value)
+    
+    return found
 
 
 class ModernScannerApp(ctk.CTk):
@@ -185,17 +422,41 @@ class ModernScannerApp(ctk.CTk):
         self.file_list = []
         self.current_preview = None
         self.form_entries = {}
+        self.form_cache = {}
         self.category_names = list(CATEGORY_CONFIG.keys())
+        self.sent_files = {}
+        self.file_signatures = {}
+        self._cleanup_lock = threading.Lock()
+        self.extract_cache = {}
+        self.extract_results = {}
+        self.extract_pending = {}
+        self.extract_failed = {}
+        self._polled_signatures = {}
+        self.autofilled = {}
+        self._hash_executor = None
+        self._extract_executor = None
+        self._pool_restarts = 0
+        self._closing = False
+        
+        if EXTRACTION_AVAILABLE:
+            # Hash dihitung di thread terbatas agar share jaringan tidak dibanjiri baca paralel
+            self._hash_executor = ThreadPoolExecutor(max_workers=EXTRACT_WORKERS)
+            self._extract_executor = self._create_extract_executor()
+        
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
         
         if not os.path.exists(self.folder_path.get()):
             os.makedirs(self.folder_path.get())
         
+        self._load_sent_files(self.folder_path.get())
+        
         self._create_ui()
         self._start_folder_monitoring()
         
         if self.category_names:
             self.selected_category.set(self.category_names[0])
             self._generate_form()
+            self.after_idle(self._prebuild_forms)
 
     def _create_ui(self):
         # Main container
@@ -306,6 +567,16 @@ class ModernScannerApp(ctk.CTk):
         # Bind click event untuk membuka dropdown
         self.category_dropdown.bind("<Button-1>", lambda e: self.category_dropdown._open_dropdown_menu())
         
+        # Status ekstraksi otomatis NIK / No. Akta
+        if EXTRACTION_AVAILABLE:
+            status_text, status_color = "🔍 Isi otomatis aktif", "gray"
+        else:
+            status_text, status_color = "🔍 Isi otomatis tidak tersedia (OCR/barcode belum terpasang)", "#FFC107"
+        self.extract_status_label = ctk.CTkLabel(panel, text=status_text,
+                                                font=ctk.CTkFont(size=11),
+                                                text_color=status_color)
+        self.extract_status_label.pack(padx=20, anchor="w")
+        
         # Form Container
         form_container = ctk.CTkScrollableFrame(panel, fg_color="transparent")
         form_container.pack(fill="both", expand=True, padx=20, pady=10)
@@ -368,25 +639,64 @@ class ModernScannerApp(ctk.CTk):
         new_folder = filedialog.askdirectory(initialdir=self.folder_path.get())
         if new_folder:
             self.folder_path.set(new_folder)
+            self._load_sent_files(new_folder)
             self._update_file_list()
 
+    def _load_sent_files(self, folder):
+        try:
+            manifest = load_sent_manifest(folder)
+        except Exception as e:
+            messagebox.showwarning("Warning", f"Gagal baca daftar file terkirim: {e}")
+            return
+        self.sent_files.update(
+            (os.path.join(folder, name), signature) for name, signature in manifest.items()
+        )
+
     def _update_file_list(self):
         current_folder = self.folder_path.get()
         
-        # Clear existing buttons
-        for btn in self.file_buttons:
-            btn.destroy()
-        self.file_buttons.clear()
-        
         if not os.path.isdir(current_folder):
+            for btn in self.file_buttons:
+                btn.destroy()
+            self.file_buttons.clear()
             self.file_list = []
             self.file_count_label.configure(text="Folder tidak valid")
             return
         
-        self.file_list = sorted([
-            f for f in os.listdir(current_folder)
-            if f.lower().endswith(('.jpg', '.jpeg')) and os.path.isfile(os.path.join(current_folder, f))
-        ])
+        # File yang sudah terkirim tapi belum diarsipkan tidak boleh dikirim ulang.
+        # Dicocokkan dengan ukuran+mtime agar scan baru dengan nama sama tetap muncul.
+        file_signatures = {}
+        try:
+            with os.scandir(current_folder) as entries:
+                for entry in entries:
+                    try:
+                        if not entry.name.lower().endswith(('.jpg', '.jpeg')) or not entry.is_file():
+                            continue
+                        st = entry.stat()
+                    except OSError:
+                        # File hilang/di-rename di tengah scan (arsip atau file sementara scanner)
+                        continue
+                    signature = (st.st_size, st.st_mtime_ns)
+                    if self.sent_files.get(entry.path) == signature:
+                        continue
+                    file_signatures[entry.name] = signature
+        except OSError:
+            # Gangguan sesaat pada folder (mis. share jaringan), pakai daftar sebelumnya
+            return
+        
+        self.file_signatures = file_signatures
+        self.file_list = sorted(self.file_signatures)
+        
+        self._queue_extraction(current_folder)
+        if self._clear_stale_autofill():
+            self._apply_extracted_candidates()
+        self._render_file_list()
+
+    def _render_file_list(self):
+        # Clear existing buttons
+        for btn in self.file_buttons:
+            btn.destroy()
+        self.file_buttons.clear()
         
         self.file_count_label.configure(text=f"{len(self.file_list)} file")
         
@@ -425,25 +735,48 @@ class ModernScannerApp(ctk.CTk):
             self.preview_label.configure(image=None, text=f"❌ Error: {str(e)[:50]}")
 
     def _generate_form(self, *args):
-        for widget in self.form_frame.winfo_children():
-            widget.destroy()
-        self.form_entries.clear()
-        
         category = self.selected_category.get()
         if not category:
             return
         
+        # Form dibangun sekali per kategori, selanjutnya hanya ditukar
+        if category not in self.form_cache:
+            self.form_cache[category] = self._build_form(category)
+        
+        for cached_category, (frame, _) in self.form_cache.items():
+            if cached_category != category:
+                frame.pack_forget()
+        
+        frame, entries = self.form_cache[category]
+        frame.pack(fill="both", expand=True)
+        self.form_entries = entries
+        
+        self._apply_extracted_candidates()
+        self._update_send_button_state()
+
+    def _prebuild_forms(self):
+        # Bangun satu form per siklus idle agar UI tetap responsif saat startup
+        for category in self.category_names:
+            if category not in self.form_cache:
+                self.form_cache[category] = self._build_form(category)
+                self.after(50, self._prebuild_forms)
+                return
+
+    def _build_form(self, category):
+        frame = ctk.CTkFrame(self.form_frame, fg_color="transparent")
+        entries = {}
+        
         fields = CATEGORY_CONFIG[category]["fields"]
         
         for field in fields:
             # Label
-            ctk.CTkLabel(self.form_frame, text=field['label'], 
+            ctk.CTkLabel(frame, text=field['label'], 
                         font=ctk.CTkFont(size=12)).pack(anchor="w", pady=(10, 5))
             
             # Widget berdasarkan type
             if field['type'] == 'date':
                 # Date Picker dengan styling modern
-                date_entry = DateEntry(self.form_frame,
+                date_entry = DateEntry(frame,
                                       width=40,
                                       background='#1f538d',
                                       foreground='white',
@@ -472,32 +805,211 @@ class ModernScannerApp(ctk.CTk):
                     disabledbackground='#343638'
                 )
                 
-                self.form_entries[field['name']] = date_entry
+                entries[field['name']] = date_entry
                 
             elif field['type'] == 'akta_format':
                 # Auto-formatted Akta Entry
-                entry = AktaFormattedEntry(self.form_frame, 
+                entry = AktaFormattedEntry(frame, 
                                           placeholder_text=field.get('placeholder', ''),
                                           height=35)
                 entry.pack(fill="x", pady=(0, 5))
-                self.form_entries[field['name']] = entry
+                entries[field['name']] = entry
                 
             else:
                 # Regular Entry
-                entry = ctk.CTkEntry(self.form_frame, 
+                entry = ctk.CTkEntry(frame, 
                                    placeholder_text=field.get('placeholder', ''),
                                    height=35)
                 entry.pack(fill="x", pady=(0, 5))
-                self.form_entries[field['name']] = entry
+                entries[field['name']] = entry
         
-        self._update_send_button_state()
+        return frame, entries
 
     def _on_category_select(self, choice):
         self._generate_form()
 
+    def _queue_extraction(self, folder):
+        if self._extract_executor is None:
+            return
+        
+        signatures = {os.path.join(folder, f): self.file_signatures[f] for f in self.file_list}
+        previous = self._polled_signatures
+        self._polled_signatures = signatures
+        
+        # Buang status untuk file yang sudah hilang atau berubah isinya
+        self.extract_results = {p: r for p, r in self.extract_results.items() if signatures.get(p) == r[0]}
+        self.extract_pending = {p: sig for p, sig in self.extract_pending.items() if signatures.get(p) == sig}
+        self.extract_failed = {p: sig for p, sig in self.extract_failed.items() if signatures.get(p) == sig}
+        
+        for file_path, signature in sorted(signatures.items()):
+            # Tunggu satu siklus polling tanpa perubahan agar file yang masih ditulis scanner tidak dibaca
+            if previous.get(file_path) != signature:
+                continue
+            if (file_path in self.extract_results or file_path in self.extract_pending
+                    or file_path in self.extract_failed):
+                continue
+            
+            self.extract_pending[file_path] = signature
+            future = self._hash_executor.submit(file_hash, file_path)
+            future.add_done_callback(
+                lambda f, p=file_path, sig=signature: self._post(self._handle_hash, p, sig, f))
+
+    def _post(self, callback, *args):
+        """Jadwalkan callback di thread UI dari thread/callback executor"""
+        try:
+            self.after(0, lambda: callback(*args))
+        except (RuntimeError, TclError):
+            # Aplikasi sudah ditutup
+            pass
+
+    def _create_extract_executor(self):
+        # "spawn" menyamakan perilaku Linux dengan Windows/PyInstaller dan
+        # menghindari fork dari thread background saat Tk berjalan
+        return ProcessPoolExecutor(max_workers=EXTRACT_WORKERS,
+                                   mp_context=multiprocessing.get_context("spawn"))
+
+    def _restart_extract_pool(self, broken_executor):
+        """Ganti process pool yang rusak karena worker crash (segfault/OOM)"""
+        if self._closing or broken_executor is not self._extract_executor:
+            # Sudah ditangani oleh job lain dari pool yang sama
+            return
+        
+        broken_executor.shutdown(wait=False, cancel_futures=True)
+        self._pool_restarts += 1
+        
+        if self._pool_restarts > EXTRACT_MAX_POOL_RESTARTS:
+            self._extract_executor = None
+            if self._hash_executor is not None:
+                self._hash_executor.shutdown(wait=False, cancel_futures=True)
+                self._hash_executor = None
+            self.extract_pending.clear()
+            self.extract_status_label.configure(
+                text="🔍 Isi otomatis dimatikan: worker OCR/barcode berulang kali crash",
+                text_color="#F44336")
+            return
+        
+        self._extract_executor = self._create_extract_executor()
+
+    def _handle_hash(self, file_path, signature, future):
+        if self._closing or self._extract_executor is None:
+            return
+        if self.extract_pending.get(file_path) != signature:
+            return
+        if future.cancelled() or future.exception() is not None:
+            self._finish_extraction(file_path, signature, None, None)
+            return
+        
+        digest = future.result()
+        cached = self.extract_cache.get(digest)
+        if cached is not None:
+            self._finish_extraction(file_path, signature, digest, cached)
+            return
+        
+        executor = self._extract_executor
+        try:
+            job = executor.submit(extract_identifiers, file_path)
+        except BrokenProcessPool:
+            self._finish_extraction(file_path, signature, None, None)
+            self._restart_extract_pool(executor)
+            return
+        job.add_done_callback(
+            lambda f: self._post(self._handle_extraction, file_path, signature, digest, f, executor))
+
+    def _handle_extraction(self, file_path, signature, digest, future, executor):
+        if self._closing:
+            return
+        
+        if future.cancelled() or future.exception() is not None:
+            result = None
+        else:
+            result = future.result()
+        self._finish_extraction(file_path, signature, digest, result)
+        
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._restart_extract_pool(executor)
+
+    def _finish_extraction(self, file_path, signature, digest, result):
+        if self.extract_pending.get(file_path) == signature:
+            del self.extract_pending[file_path]
+        
+        if result is None:
+            # Kegagalan tidak di-cache; file dicoba lagi setelah ukuran/mtime berubah
+            self.extract_failed[file_path] = signature
+            return
+        
+        self.extract_results[file_path] = (signature, result)
+        if digest:
+            self.extract_cache[digest] = result
+        self._apply_extracted_candidates()
+
+    def _apply_extracted_candidates(self):
+        """Isi NIK/No. Akta kosong dari hasil ekstraksi file pertama yang punya kandidat"""
+        self._clear_stale_autofill()
+        
+        category = self.selected_category.get()
+        if not category or not self.extract_results:
+            return
+        
+        folder = self.folder_path.get()
+        field_types = {f['name']: f['type'] for f in CATEGORY_CONFIG[category]["fields"]}
+        
+        for key in ('nik', 'noAkta'):
+            widget = self.form_entries.get(key)
+            if widget is None or widget.get():
+                continue
+            # No. Akta hanya diisi untuk kategori dengan format akta yang tervalidasi
+            if key == 'noAkta' and field_types.get(key) != 'akta_format':
+                continue
+            
+            for file_name in self.file_list:
+                file_path = os.path.join(folder, file_name)
+                _, result = self.extract_results.get(file_path, (None, {}))
+                value = result.get(key)
+                if value:
+                    self._set_entry_text(widget, value)
+                    self.autofilled[(category, key)] = (file_path, value)
+                    break
+
+    def _clear_stale_autofill(self):
+        """Kosongkan nilai otomatis di semua form bila file sumbernya sudah tidak ada di daftar"""
+        folder = self.folder_path.get()
+        current_paths = {os.path.join(folder, f) for f in self.file_list}
+        cleared = False
+        
+        for (category, key), (file_path, value) in list(self.autofilled.items()):
+            widget = self.form_cache[category][1][key]
+            if widget.get() != value:
+                # Sudah diubah operator (atau direset), bukan lagi nilai otomatis
+                del self.autofilled[(category, key)]
+            elif file_path not in current_paths or file_path not in self.extract_results:
+                self._set_entry_text(widget, "")
+                del self.autofilled[(category, key)]
+                cleared = True
+        
+        return cleared
+
+    def _set_entry_text(self, widget, value):
+        if isinstance(widget, AktaFormattedEntry):
+            widget.set_value(value)
+        else:
+            widget.delete(0, 'end')
+            if value:
+                widget.insert(0, value)
+
+    def _on_close(self):
+        self._closing = True
+        if self._hash_executor is not None:
+            self._hash_executor.shutdown(wait=False, cancel_futures=True)
+        if self._extract_executor is not None:
+            self._extract_executor.shutdown(wait=False, cancel_futures=True)
+        self.destroy()
+
     def _start_folder_monitoring(self):
-        self._update_file_list()
-        self.after(1000, self._start_folder_monitoring)
+        try:
+            self._update_file_list()
+        finally:
+            # Tetap jadwalkan ulang agar satu error sesaat tidak menghentikan monitoring
+            self.after(1000, self._start_folder_monitoring)
 
     def _update_send_button_state(self):
         if self.access_token and self.file_list:
@@ -525,12 +1037,12 @@ class ModernScannerApp(ctk.CTk):
                 return False, f"Bidang '{field['label']}' wajib diisi."
             
             if key == 'noAkta' and category_name == 'Akta Kelahiran':
-                if not re.fullmatch(r"\d{4}-[A-Z]{2}-\d{8}-\d{4}", value.upper()):
+                if not re.fullmatch(NO_AKTA_PATTERN, value.upper()):
                     return False, "Format No. Akta tidak valid (Contoh: 3502-LU-31072002-0001)"
                 payload[key] = value.upper()
             
             elif key == 'nik':
-                if not re.fullmatch(r"\d{16}", value):
+                if not re.fullmatch(NIK_PATTERN, value):
                     return False, "NIK harus 16 digit angka."
             
             elif key == 'tanggal':
@@ -668,13 +1180,16 @@ class ModernScannerApp(ctk.CTk):
             self.after(0, lambda: self.send_button.configure(text="🚀 Kirim ke Server", state="normal"))
 
     def _handle_success(self, file_names, original_payload):
-        # Delete files
-        for file_name in file_names:
-            file_path = os.path.join(self.folder_path.get(), file_name)
-            try:
-                os.remove(file_path)
-            except Exception as e:
-                messagebox.showwarning("Warning", f"Gagal hapus {file_name}: {e}")
+        folder = self.folder_path.get()
+        
+        # Sembunyikan file terkirim segera, arsip dikerjakan di background
+        sent = {f: self.file_signatures[f] for f in file_names if f in self.file_signatures}
+        self.sent_files.update((os.path.join(folder, f), sig) for f, sig in sent.items())
+        self.file_list = [f for f in self.file_list if f not in file_names]
+        
+        threading.Thread(target=self._cleanup_thread,
+                        args=(folder, sent),
+                        daemon=True).start()
         
         # Reset form (keep noFisik)
         no_fisik_value = original_payload.get('noFisik', '')
@@ -693,10 +1208,54 @@ class ModernScannerApp(ctk.CTk):
         self.current_preview = None
         
         # Update list
-        self._update_file_list()
+        self._render_file_list()
+        self._apply_extracted_candidates()
         self.send_button.configure(text="🚀 Kirim ke Server", state="normal")
 
+    def _cleanup_thread(self, folder, sent):
+        file_names = list(sent)
+        failures = []
+        retention_failures = []
+        try:
+            with self._cleanup_lock:
+                failures = archive_sent_files(folder, file_names)
+                retention_failures = enforce_sent_retention(folder)
+                
+                # Catat file yang gagal dipindah agar tetap tersembunyi setelah restart;
+                # entri yang file-nya sudah dipindah/diganti operator dibuang
+                failed_names = {name for name, _ in failures}
+                manifest = load_sent_manifest(folder)
+                manifest = {name: sig for name, sig in manifest.items()
+                            if file_signature(os.path.join(folder, name)) == sig}
+                manifest.update((name, sent[name]) for name in failed_names)
+                save_sent_manifest(folder, manifest)
+        except Exception as e:
+            # Pastikan ringkasan tetap ditampilkan walau terjadi error tak terduga
+            retention_failures.append((SENT_MANIFEST_NAME, e))
+        
+        failed_paths = {os.path.join(folder, name) for name, _ in failures}
+        
+        def finish():
+            # File yang gagal diarsip tetap disembunyikan agar tidak terkirim dua kali
+            for file_name in file_names:
+                file_path = os.path.join(folder, file_name)
+                if file_path not in failed_paths:
+                    self.sent_files.pop(file_path, None)
+            
+            if failures or retention_failures:
+                lines = [f"- {name}: {e}" for name, e in failures + retention_failures]
+                message = "Beberapa file gagal diarsipkan:\n" + "\n".join(lines[:10])
+                if len(lines) > 10:
+                    message += f"\n... dan {len(lines) - 10} lainnya"
+                if failures:
+                    message += (f"\n\nFile yang sudah terkirim disembunyikan dari daftar. "
+                               f"Pindahkan manual ke folder '{SENT_DIR_NAME}'.")
+                messagebox.showwarning("Warning", message)
+        
+        self.after(0, finish)
 
 if __name__ == "__main__":
+    # Diperlukan agar process pool ekstraksi berjalan di build PyInstaller (Windows)
+    multiprocessing.freeze_support()
     app = ModernScannerApp()
     app.mainloop()
\ No newline at end of file
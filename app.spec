@@ -4,6 +4,7 @@
 a = Analysis(
     ['app.py'],
     pathex=[],
+    # Opsional: DLL zbar untuk pyzbar (isi otomatis barcode), lihat README
     binaries=[],
     datas=[],
     hiddenimports=[],